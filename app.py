@@ -4,16 +4,43 @@ import base64
 import imaplib
 import smtplib
 import time
+import gzip
+import hashlib
+import mimetypes
+import threading
+import zipfile
+import json
+import quopri
+import bisect
+import math
+import atexit
 import email
+import click
 from email import policy, encoders
 from email.header import decode_header
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.utils import parsedate_to_datetime
+from email.utils import getaddresses, make_msgid, parsedate_to_datetime
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import (
+    Flask, Response, request, jsonify, render_template, send_file, send_from_directory,
+    stream_with_context, url_for,
+)
 from io import BytesIO
+from urllib.parse import unquote
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
 
 load_dotenv()
 
@@ -25,11 +52,171 @@ EMAIL_ACCOUNT = os.getenv('EMAIL_ACCOUNT')
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
 TRASH_MAILBOX = "Gel&APY-scht"
 
+# JSON responses smaller than this are sent as-is; compressing them costs more than it saves
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_MIMETYPES = ("application/json",)
+# Static assets requested with a content hash (?v=...) never change under that URL
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".svg", ".html")
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+# body bytes fetched per list row; enough for the preview, never the attachments
+PREVIEW_FETCH_BYTES = 4096
+
 app = Flask(__name__)
 
+_static_hashes = {}
+
+def _accepted_encoding():
+    """
+    Pick the best content encoding the client accepts ('br', 'gzip' or None).
+    Brotli is only offered when the optional 'brotli' package is installed.
+    """
+    offers = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offers)
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+def static_hash(filename):
+    """
+    Short content hash of a file in the static folder, cached per mtime.
+    """
+    path = os.path.join(app.static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    cached = _static_hashes.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    _static_hashes[filename] = (mtime, digest)
+    return digest
+
+@app.template_global()
+def static_url(filename):
+    """
+    url_for('static') with a content hash appended, so the asset can be
+    cached forever and the URL changes whenever the file does.
+    """
+    digest = static_hash(filename)
+    if digest:
+        return url_for("static", filename=filename, v=digest)
+    return url_for("static", filename=filename)
+
+def serve_static(filename):
+    """
+    Static file view: serves a precompressed .br/.gz sibling when one exists
+    and the client accepts it, and marks hashed URLs as immutable.
+    """
+    encoding = _accepted_encoding()
+    response = None
+
+    if encoding:
+        ext = ".br" if encoding == "br" else ".gz"
+        compressed = os.path.join(app.static_folder, filename + ext)
+        original = os.path.join(app.static_folder, filename)
+        try:
+            fresh = os.path.getmtime(compressed) >= os.path.getmtime(original)
+        except OSError:
+            fresh = False
+        if fresh:
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(app.static_folder, filename + ext, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+
+    if response is None:
+        response = app.send_static_file(filename)
+
+    response.vary.add("Accept-Encoding")
+    # only the current hash is pinned; a stale or made-up ?v= must not freeze today's file
+    version = request.args.get("v")
+    if version and version == static_hash(filename):
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+# Swapped in for Flask's own static view (rather than static_folder=None plus a
+# route) so the "static" endpoint, and every url_for("static") using it, stays as is
+app.view_functions["static"] = serve_static
+
+@app.after_request
+def compress_response(response):
+    """
+    Gzip/Brotli-compress JSON responses above COMPRESS_MIN_SIZE when the
+    client advertises support for it via Accept-Encoding.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _accepted_encoding()
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(_compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+
+    # The compressed body is no longer byte-identical to what a strong ETag promised
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def conditional_json(payload):
+    """
+    jsonify() with an ETag, answering 304 Not Modified when the client's
+    If-None-Match already matches, so cached copies can be revalidated cheaply.
+    """
+    response = jsonify(payload)
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.cli.command("build-assets")
+def build_assets():
+    """
+    Write .gz (and .br, if brotli is installed) copies of the static assets
+    so they can be served without compressing on every request.
+    """
+    encodings = ["gzip", "br"] if brotli is not None else ["gzip"]
+    for root, _, files in os.walk(app.static_folder):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            for encoding in encodings:
+                target = path + (".br" if encoding == "br" else ".gz")
+                with open(target, "wb") as out:
+                    out.write(_compress(data, encoding))
+            click.echo(f"compressed {os.path.relpath(path, app.static_folder)}")
+
 def connect_imap():
     imap = imaplib.IMAP4_SSL(IMAP_SERVER, IMAP_PORT)
     imap.login(EMAIL_ACCOUNT, EMAIL_PASSWORD)
+    # many servers (e.g. Dovecot) only list extensions like THREAD, SORT or
+    # LITERAL+ once authenticated; imaplib keeps the pre-login greeting list
+    typ, data = imap.capability()
+    if typ == "OK" and data and data[-1]:
+        imap.capabilities = tuple(data[-1].decode("ascii", "replace").upper().split())
     return imap
 
 def decode_str(s):
@@ -125,32 +312,459 @@ def parse_priority_header(msg):
         return "low"
     return "normal"
 
-def fetch_emails(imap, mailbox="INBOX"):
+CONTACTS_PATH = os.getenv(
+    "CONTACTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".contacts.json")
+)
+# changes are written to disk at most this often (seconds)
+CONTACTS_SAVE_DELAY = 5
+CONTACT_SUGGEST_LIMIT = 10
+# a sighting counts half as much after this many days
+CONTACT_HALF_LIFE_DAYS = 30
+# ranks are stored relative to this fixed time, so they never need re-scoring
+CONTACT_RANK_EPOCH = 1_600_000_000
+# every prefix up to this length keeps its best contacts ready
+CONTACT_BUCKET_PREFIX_LEN = 3
+# contacts kept per prefix bucket; longer prefixes are answered from these
+CONTACT_BUCKET_SIZE = 50
+# sent mail says more about who you write to than received mail
+CONTACT_SENT_WEIGHT = 2
+# up to this many new terms are inserted one by one, more are merged with a sort
+CONTACT_INSORT_MAX = 256
+
+# address (lowercase) -> {"name", "address", "count", "last_seen", "rank"}
+_contacts = {}
+# address -> rank, mirrored from _contacts so ranking can use a C-level dict lookup as key
+_contact_ranks = {}
+# sorted (search term, address) pairs; a prefix query is one bisect + a contiguous scan
+_contact_keys = []
+# terms added since the last scan, merged into _contact_keys in one sort
+_contact_pending = []
+# Message-IDs (or contact_message_key() stand-ins) already harvested, so
+# re-listing a folder doesn't inflate counts
+_contact_messages = set()
+# prefix (up to CONTACT_BUCKET_PREFIX_LEN) -> best CONTACT_BUCKET_SIZE addresses, by rank
+_contact_top = {}
+_contacts_lock = threading.Lock()
+# serializes writers of CONTACTS_PATH (timer thread vs. exit flush)
+_contacts_save_lock = threading.Lock()
+_contacts_save_timer = None
+
+def _contact_terms(name, address):
     """
-    Fetch latest emails from the given IMAP mailbox.
+    Search terms for one contact: the address, the full name and each name word.
     """
-    imap.select(mailbox)
-    status, messages = imap.search(None, "ALL")
-    if status != "OK":
+    name = (name or "").lower()
+    return {address, name, *name.split()} - {""}
+
+def _contact_prefixes(name, address):
+    return {
+        term[:n]
+        for term in _contact_terms(name, address)
+        for n in range(1, min(len(term), CONTACT_BUCKET_PREFIX_LEN) + 1)
+    }
+
+def _contact_gain(when, weight):
+    """
+    log2 of one sighting's weight, decayed relative to CONTACT_RANK_EPOCH.
+    """
+    return math.log2(weight) + (when - CONTACT_RANK_EPOCH) / (CONTACT_HALF_LIFE_DAYS * 86400)
+
+def _bucket_contact(key):
+    """
+    Put a contact whose rank just went up into the buckets of its term prefixes.
+    Ranks only grow, so a full bucket keeps holding the best matches of its prefix.
+    """
+    rank = _contacts[key]["rank"]
+    for prefix in _contact_prefixes(_contacts[key]["name"], key):
+        bucket = _contact_top.setdefault(prefix, [])
+        if key not in bucket:
+            if len(bucket) >= CONTACT_BUCKET_SIZE and _contact_ranks[bucket[-1]] >= rank:
+                continue
+            bucket.append(key)
+        bucket.sort(key=_contact_ranks.get, reverse=True)
+        del bucket[CONTACT_BUCKET_SIZE:]
+
+def _add_contact(name, address, when, weight):
+    key = address.lower()
+    entry = _contacts.get(key)
+    if entry is None:
+        entry = {"name": name, "address": address, "count": 0, "last_seen": 0, "rank": -math.inf}
+        _contacts[key] = entry
+        _contact_pending.extend((term, key) for term in _contact_terms(name, key))
+    elif name and not entry["name"]:
+        entry["name"] = name
+        _contact_pending.extend((term, key) for term in _contact_terms(name, key) - {key})
+    entry["count"] += weight
+    entry["last_seen"] = max(entry["last_seen"], when)
+
+    # rank = log2 of the sum of all decayed sightings (frequency and recency
+    # in one number); adding a sighting in log space avoids overflow
+    a, b = sorted((entry["rank"], _contact_gain(when, weight)))
+    entry["rank"] = _contact_ranks[key] = b + math.log2(1 + 2 ** (a - b))
+    _bucket_contact(key)
+
+def contact_message_key(message_id, mailbox, uidvalidity, uid):
+    """
+    Dedup key for record_contacts(): the first Message-ID of the header, or
+    the message's position for mail that has none.
+    """
+    ids = _parse_msg_ids(message_id)
+    return ids[0] if ids else f"uid:{mailbox}:{uidvalidity}:{uid}"
+
+def record_contacts(header_values, when=None, message_id=None, weight=1):
+    """
+    Harvest the addresses from raw From/To/Cc header values into the contact index.
+    """
+    global _contacts_save_timer
+
+    own = (EMAIL_ACCOUNT or "").lower()
+    # Date headers are sender-controlled; a future date would pin a contact
+    # to the top for good, since ranks only grow and are persisted
+    now = time.time()
+    when = min(when or now, now)
+    pairs = [
+        (decode_str(name).strip(), address.strip())
+        for name, address in getaddresses([v for v in header_values if v])
+        if "@" in address and address.strip().lower() != own
+    ]
+    if not pairs:
+        return
+
+    with _contacts_lock:
+        if message_id:
+            message_id = message_id.strip()
+            if message_id in _contact_messages:
+                return
+            _contact_messages.add(message_id)
+
+        for name, address in pairs:
+            _add_contact(name, address, when, weight)
+
+        if _contacts_save_timer is None:
+            _contacts_save_timer = threading.Timer(CONTACTS_SAVE_DELAY, save_contacts)
+            _contacts_save_timer.daemon = True
+            _contacts_save_timer.start()
+
+def _scan_contacts(prefix):
+    """
+    Every address with a term starting with 'prefix', from the sorted term list.
+    """
+    if len(_contact_pending) > CONTACT_INSORT_MAX:
+        # bulk sync: timsort merges the appended run in linear time
+        _contact_keys.extend(_contact_pending)
+        _contact_keys.sort()
+    else:
+        for item in _contact_pending:
+            bisect.insort(_contact_keys, item)
+    _contact_pending.clear()
+
+    # the matching terms are one contiguous slice, bounded by two bisects
+    lo = bisect.bisect_left(_contact_keys, (prefix,))
+    hi = bisect.bisect_left(_contact_keys, (prefix + "\U0010ffff",), lo)
+    return {address for _, address in _contact_keys[lo:hi]}
+
+def suggest_contacts(prefix, limit=CONTACT_SUGGEST_LIMIT):
+    """
+    Contacts whose address, name or a name word starts with 'prefix',
+    ranked by how often and how recently they were seen.
+    """
+    prefix = (prefix or "").strip().lower()
+    if not prefix:
         return []
 
-    email_ids = messages[0].split()
+    with _contacts_lock:
+        bucket = _contact_top.get(prefix[:CONTACT_BUCKET_PREFIX_LEN], [])
+        if len(prefix) <= CONTACT_BUCKET_PREFIX_LEN:
+            ranked = bucket
+        else:
+            # Every match of the longer prefix is also in the bucket's prefix, so
+            # the bucket's matches are the true top ones once there are 'limit'
+            # of them, or when the bucket isn't full and so holds every match
+            ranked = [
+                a for a in bucket
+                if any(t.startswith(prefix) for t in _contact_terms(_contacts[a]["name"], a))
+            ]
+            if len(ranked) < limit and len(bucket) >= CONTACT_BUCKET_SIZE:
+                # a plain C sort beats nlargest's per-item key wrapping here
+                ranked = sorted(_scan_contacts(prefix), key=_contact_ranks.get, reverse=True)
+
+        return [
+            {"name": _contacts[a]["name"], "address": _contacts[a]["address"]}
+            for a in ranked[:limit]
+        ]
+
+def save_contacts():
+    global _contacts_save_timer
+    with _contacts_lock:
+        _contacts_save_timer = None
+        data = {
+            "contacts": list(_contacts.values()),
+            "messages": list(_contact_messages),
+        }
+
+    tmp = CONTACTS_PATH + ".tmp"
+    with _contacts_save_lock:
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, CONTACTS_PATH)
+        except OSError:
+            pass
+
+def _flush_contacts():
+    if _contacts_save_timer is not None:
+        _contacts_save_timer.cancel()
+        save_contacts()
+
+def load_contacts():
+    """
+    Load the persisted index; the term list is sorted once instead of insort per contact.
+    """
+    try:
+        with open(CONTACTS_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if not isinstance(data, dict):
+        return
+
+    now = time.time()
+    with _contacts_lock:
+        for entry in data.get("contacts") or []:
+            # a hand-edited or truncated file shouldn't keep the app from starting
+            if not isinstance(entry, dict):
+                continue
+            address, name = entry.get("address"), entry.get("name")
+            if not isinstance(address, str) or "@" not in address or not isinstance(name, str):
+                continue
+            try:
+                count = max(int(entry.get("count", 1)), 1)
+                last_seen = min(float(entry.get("last_seen", 0)), now)
+                rank = float(entry.get("rank", _contact_gain(last_seen, count)))
+            except (TypeError, ValueError):
+                continue
+            # no honest rank beats 'count' sightings all made right now; this
+            # also repairs ranks saved before future dates were clamped
+            rank = min(rank, _contact_gain(now, count))
+
+            key = address.lower()
+            _contacts[key] = {
+                "name": name, "address": address, "count": count, "last_seen": last_seen, "rank": rank,
+            }
+            _contact_ranks[key] = rank
+            _contact_keys.extend((term, key) for term in _contact_terms(name, key))
+        _contact_keys.sort()
+
+        messages = data.get("messages", [])
+        if isinstance(messages, list):
+            _contact_messages.update(m for m in messages if isinstance(m, str))
+
+def _fill_contact_buckets():
+    """
+    Fill the prefix buckets in one pass over the contacts in rank order.
+    Runs in the background at startup; suggestions wait on the lock meanwhile.
+    """
+    with _contacts_lock:
+        # rebuilt from scratch, so contacts recorded before this ran can't be doubled
+        top = {}
+        for key in sorted(_contacts, key=_contact_ranks.get, reverse=True):
+            for prefix in _contact_prefixes(_contacts[key]["name"], key):
+                bucket = top.setdefault(prefix, [])
+                if len(bucket) < CONTACT_BUCKET_SIZE:
+                    bucket.append(key)
+        _contact_top.clear()
+        _contact_top.update(top)
+
+load_contacts()
+threading.Thread(target=_fill_contact_buckets, daemon=True).start()
+atexit.register(_flush_contacts)
+
+# /api/messages ?sort= values -> RFC 5256 sort keys
+SORT_KEYS = {
+    "date": "DATE",
+    "arrival": "ARRIVAL",
+    "from": "FROM",
+    "subject": "SUBJECT",
+    "size": "SIZE",
+}
+# /api/messages ?filter= values -> SEARCH criteria
+SEARCH_FILTERS = {
+    "all": ["ALL"],
+    "unread": ["UNSEEN"],
+    "flagged": ["FLAGGED"],
+    "high": ["OR", "HEADER", "X-Priority", "1", "OR", "HEADER", "X-Priority", "2", "HEADER", "Importance", "high"],
+}
+
+def _imap_quote(value):
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _expand_uid_set(value):
+    """
+    Expand an IMAP sequence set into UIDs, keeping the order the server used
+    ('9:7,2' -> [9, 8, 7, 2]); ESORT may return descending ranges.
+    """
+    uids = []
+    for part in value.split(","):
+        if not part or part == "NIL":
+            continue
+        a, _, b = part.partition(":")
+        a = int(a)
+        b = int(b) if b else a
+        step = 1 if b >= a else -1
+        uids.extend(range(a, b + step, step))
+    return uids
+
+def _esearch_result(imap):
+    """
+    Parse the untagged ESEARCH response of the last command into (uids, count).
+    """
+    typ, data = imap.response("ESEARCH")
+    raw = b" ".join(d for d in data if isinstance(d, bytes)).decode(errors="ignore")
+
+    count = None
+    m = re.search(r"\bCOUNT (\d+)", raw)
+    if m:
+        count = int(m.group(1))
+
+    uids = []
+    m = re.search(r"\bPARTIAL \(\S+ ([^)]*)\)", raw) or re.search(r"\bALL (\S+)", raw)
+    if m:
+        uids = _expand_uid_set(m.group(1))
+    return uids, count
+
+def _search_command(imap, command, *args):
+    """
+    Run a UID SORT/SEARCH. A trailing bytes argument goes out as a literal,
+    the only way imaplib sends a non-ASCII search value.
+    """
+    if args and isinstance(args[-1], bytes):
+        imap.literal = args[-1]
+        args = args[:-1]
+    return imap.uid(command, *args)
+
+def search_uids(imap, criteria, sort="date", reverse=True, offset=0, limit=PAGE_SIZE):
+    """
+    Return (uids, total) for one page of the selected mailbox.
+
+    Ordering and counting happen on the server wherever it can:
+    - ESORT + PARTIAL: UID SORT RETURN (COUNT PARTIAL ...) -> just the page and the count
+    - SORT: UID SORT -> the full ordered UID list, sliced here
+    - ESEARCH + PARTIAL: UID SEARCH RETURN (COUNT PARTIAL ...) in arrival order
+    - otherwise plain UID SEARCH in arrival order
+    Without SORT every sort key falls back to arrival (UID) order.
+    A UTF-8 value can be passed as bytes in the last criterion.
+    """
+    caps = imap.capabilities
+    lo, hi = offset + 1, offset + limit
+    # SORT always names its charset, SEARCH only needs one for a UTF-8 literal
+    charset = ("CHARSET", "UTF-8") if criteria and isinstance(criteria[-1], bytes) else ()
+
+    if "SORT" in caps and sort in SORT_KEYS:
+        program = f"({'REVERSE ' if reverse else ''}{SORT_KEYS[sort]})"
+        if "ESORT" in caps and "PARTIAL" in caps:
+            status, _ = _search_command(
+                imap, "SORT", "RETURN", f"(COUNT PARTIAL {lo}:{hi})", program, "UTF-8", *criteria
+            )
+            if status == "OK":
+                uids, count = _esearch_result(imap)
+                return uids, count if count is not None else len(uids)
+        status, data = _search_command(imap, "SORT", program, "UTF-8", *criteria)
+        if status == "OK":
+            uids = [int(u) for u in (data[0] or b"").split()]
+            return uids[offset:offset + limit], len(uids)
+
+    if "ESEARCH" in caps and "PARTIAL" in caps:
+        # negative ranges count from the highest UID, i.e. newest first
+        partial = f"-{lo}:-{hi}" if reverse else f"{lo}:{hi}"
+        status, _ = _search_command(
+            imap, "SEARCH", "RETURN", f"(COUNT PARTIAL {partial})", *charset, *criteria
+        )
+        if status == "OK":
+            uids, count = _esearch_result(imap)
+            uids.sort(reverse=reverse)
+            return uids, count if count is not None else len(uids)
+
+    status, data = _search_command(imap, "SEARCH", *charset, *criteria)
+    if status != "OK":
+        return [], 0
+    uids = [int(u) for u in (data[0] or b"").split()]
+    if reverse:
+        uids.reverse()
+    return uids[offset:offset + limit], len(uids)
+
+def _fetch_list_rows(imap, uids):
+    """
+    Fetch flags, full headers and the start of the body for 'uids' in one
+    UID FETCH. Returns {uid: (flags, header bytes, body bytes)}.
+    """
+    status, data = imap.uid(
+        "FETCH", _uid_set(uids),
+        f"(UID FLAGS BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{PREVIEW_FETCH_BYTES}>)",
+    )
+    if status != "OK" or not data:
+        return {}
+
+    # one message spans several items: its HEADER literal, its TEXT literal
+    # and a closing ')' that may still carry FLAGS
+    messages = []
+    for item in data:
+        meta = item[0] if isinstance(item, tuple) else item
+        if not isinstance(meta, bytes):
+            continue
+        if re.match(rb"\d+ \(", meta):
+            messages.append({"meta": b"", "header": b"", "text": b""})
+        if not messages:
+            continue
+        current = messages[-1]
+        current["meta"] += meta
+        if isinstance(item, tuple):
+            current["header" if b"BODY[HEADER]" in meta.upper() else "text"] = item[1]
+
+    rows = {}
+    for m in messages:
+        uid, flags, _ = _fetch_meta(m["meta"])
+        if uid:
+            rows[uid] = (flags, m["header"], m["text"])
+    return rows
+
+def fetch_emails(imap, mailbox="INBOX", offset=0, limit=PAGE_SIZE,
+                 sort="date", reverse=True, criteria=("ALL",)):
+    """
+    Fetch one page of emails from the given IMAP mailbox, newest first by default.
+    Returns (emails, total) where total counts every message matching 'criteria'.
+    """
+    imap.select(mailbox, readonly=True)
+    uidvalidity = _response_value(imap, "UIDVALIDITY")
+    uids, total = search_uids(imap, list(criteria), sort=sort, reverse=reverse, offset=offset, limit=limit)
+    rows = _fetch_list_rows(imap, uids) if uids else {}
+
     emails = []
-    for eid in reversed(email_ids[-20:]):
-        status, msg_data = imap.fetch(eid, "(RFC822 FLAGS)")
-        if status != "OK" or not msg_data or not msg_data[0]:
+    # rows come back in server order, the page keeps the SORT/SEARCH order
+    for uid in uids:
+        if uid not in rows:
             continue
-        raw_flags = msg_data[0][0].decode() if msg_data and msg_data[0] else ""
-        is_unread = "\\Seen" not in raw_flags
-        msg = email.message_from_bytes(msg_data[0][1])
+        flags, header, text = rows[uid]
+        is_unread = "\\Seen" not in flags
+        # the body is cut at PREVIEW_FETCH_BYTES; the parser tolerates the
+        # truncated MIME structure and the preview only needs its start
+        msg = email.message_from_bytes(header + text)
         subject = decode_str(msg.get("Subject"))
         sender = decode_str(msg.get("From"))
         date_str = msg.get("Date")
+        date_ts = None
         try:
-            date_fmt = parsedate_to_datetime(date_str).strftime("%Y-%m-%d %H:%M") if date_str else ""
+            date_dt = parsedate_to_datetime(date_str) if date_str else None
+            date_fmt = date_dt.strftime("%Y-%m-%d %H:%M") if date_dt else ""
+            date_ts = date_dt.timestamp() if date_dt else None
         except Exception:
             date_fmt = ""
 
+        record_contacts(
+            [msg.get("From"), msg.get("To"), msg.get("Cc")],
+            when=date_ts,
+            message_id=contact_message_key(msg.get("Message-ID"), mailbox, uidvalidity, uid),
+        )
+
         # Priority
         priority = parse_priority_header(msg)
 
@@ -187,7 +801,7 @@ def fetch_emails(imap, mailbox="INBOX"):
         preview = (html_to_text(body).replace("\n", " ").strip()[:90] + "...") if body else ""
 
         emails.append({
-            "id": eid.decode(),
+            "id": str(uid),
             "sender": sender,
             "subject": subject,
             "preview": preview,
@@ -196,7 +810,7 @@ def fetch_emails(imap, mailbox="INBOX"):
             "account": "gmx",
             "priority": priority,
         })
-    return emails
+    return emails, total
 
 def decode_imap_utf7(name):
     """
@@ -331,14 +945,780 @@ def find_sent_mailbox(imap):
             return encoded_name
     return "INBOX"
 
+# TO/CC are not needed for threading but feed the contact index for free
+THREAD_HEADER_FIELDS = "MESSAGE-ID IN-REPLY-TO REFERENCES SUBJECT FROM TO CC DATE"
+# UIDs per header FETCH, keeps single responses small on big folders
+HEADER_FETCH_BATCH = 500
+# header summaries kept across all mailboxes; the thread index itself only keeps ids
+HEADER_CACHE_SIZE = 20000
+
+# (mailbox, uidvalidity, uid) -> header summary, LRU; UIDs never get reused within a UIDVALIDITY
+_header_cache = OrderedDict()
+_header_cache_lock = threading.Lock()
+# mailbox -> local References index, see _local_threads()
+_thread_indexes = {}
+# mailbox -> lock, so indexing one folder doesn't hold up the others
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+def _uid_set(uids):
+    """
+    Compress sorted UIDs into an IMAP sequence set, e.g. [1, 2, 3, 7] -> '1:3,7'.
+    """
+    ranges = []
+    for uid in sorted(uids):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(a) if a == b else f"{a}:{b}" for a, b in ranges)
+
+def _response_value(imap, code):
+    """
+    Read an untagged response code left over from SELECT (e.g. UIDVALIDITY, EXISTS).
+    """
+    typ, data = imap.response(code)
+    try:
+        return int(data[-1])
+    except (TypeError, ValueError, IndexError):
+        return 0
+
+def _parse_msg_ids(value):
+    return re.findall(r"<[^<>\s]+>", value or "")
+
+def _fetch_header_summaries(imap, mailbox, uidvalidity, uids):
+    """
+    Fetch and parse the threading headers for the given UIDs.
+    Returns {uid: {message_id, in_reply_to, references, subject, sender, date_str}}.
+    """
+    summaries = {}
+    uids = sorted(uids)
+    for i in range(0, len(uids), HEADER_FETCH_BATCH):
+        batch = uids[i:i + HEADER_FETCH_BATCH]
+        status, data = imap.uid(
+            "FETCH", _uid_set(batch), f"(UID BODY.PEEK[HEADER.FIELDS ({THREAD_HEADER_FIELDS})])"
+        )
+        if status != "OK" or not data:
+            continue
+
+        for item in data:
+            if not isinstance(item, tuple):
+                continue
+            m = re.search(rb"UID (\d+)", item[0])
+            if not m:
+                continue
+
+            msg = email.message_from_bytes(item[1])
+            date_str = msg.get("Date")
+            date_ts = None
+            try:
+                date_dt = parsedate_to_datetime(date_str) if date_str else None
+                date_fmt = date_dt.strftime("%Y-%m-%d %H:%M") if date_dt else ""
+                date_ts = date_dt.timestamp() if date_dt else None
+            except Exception:
+                date_fmt = ""
+
+            uid = int(m.group(1))
+            message_ids = _parse_msg_ids(msg.get("Message-ID"))
+            record_contacts(
+                [msg.get("From"), msg.get("To"), msg.get("Cc")],
+                when=date_ts,
+                message_id=contact_message_key(msg.get("Message-ID"), mailbox, uidvalidity, uid),
+            )
+            summaries[uid] = {
+                "message_id": message_ids[0] if message_ids else None,
+                "in_reply_to": _parse_msg_ids(msg.get("In-Reply-To")),
+                "references": _parse_msg_ids(msg.get("References")),
+                "subject": decode_str(msg.get("Subject")),
+                "sender": decode_str(msg.get("From")),
+                "date_str": date_fmt,
+            }
+    return summaries
+
+def header_summaries(imap, mailbox, uidvalidity, uids):
+    """
+    Header summaries for 'uids', fetching only the ones not cached yet.
+    """
+    found = {}
+    with _header_cache_lock:
+        for uid in uids:
+            key = (mailbox, uidvalidity, uid)
+            if key in _header_cache:
+                _header_cache.move_to_end(key)
+                found[uid] = _header_cache[key]
+
+    missing = [uid for uid in uids if uid not in found]
+    if missing:
+        fetched = _fetch_header_summaries(imap, mailbox, uidvalidity, missing)
+        found.update(fetched)
+        with _header_cache_lock:
+            for uid, summary in fetched.items():
+                _header_cache[(mailbox, uidvalidity, uid)] = summary
+            while len(_header_cache) > HEADER_CACHE_SIZE:
+                _header_cache.popitem(last=False)
+    return found
+
+def _thread_lock(mailbox):
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(mailbox, threading.Lock())
+
+def _parse_thread_response(data):
+    """
+    Flatten a THREAD response like '(1)(2 3)(4 (5)(6))' into one UID list
+    per top-level thread: [[1], [2, 3], [4, 5, 6]].
+    """
+    raw = b"".join(d for d in data if isinstance(d, bytes))
+    threads = []
+    current = []
+    depth = 0
+    for token in re.findall(rb"\(|\)|\d+", raw):
+        if token == b"(":
+            if depth == 0:
+                current = []
+            depth += 1
+        elif token == b")":
+            depth -= 1
+            if depth == 0 and current:
+                threads.append(current)
+        else:
+            current.append(int(token))
+    return threads
+
+def _thread_add(index, uid, header):
+    """
+    Attach one message to the index. Its References/In-Reply-To ids are looked
+    up in a dict, so joining an existing thread is O(1); when a message links
+    two threads, the smaller one is merged into the larger.
+    """
+    header = header or {}
+    own_id = header.get("message_id") or f"<uid-{uid}@local>"
+    linked = header.get("references", []) + header.get("in_reply_to", [])
+
+    thread_of = index["thread_of"]
+    threads = index["threads"]
+
+    related = {thread_of[mid] for mid in linked + [own_id] if mid in thread_of}
+    if related:
+        target = max(related, key=lambda key: len(threads[key]["ids"]))
+        for key in related - {target}:
+            other = threads.pop(key)
+            for mid in other["ids"]:
+                thread_of[mid] = target
+            for other_uid in other["uids"]:
+                index["uid_thread"][other_uid] = target
+            threads[target]["ids"] |= other["ids"]
+            threads[target]["uids"] |= other["uids"]
+    else:
+        target = own_id
+        threads[target] = {"ids": set(), "uids": set()}
+
+    for mid in linked + [own_id]:
+        thread_of[mid] = target
+        threads[target]["ids"].add(mid)
+    threads[target]["uids"].add(uid)
+    index["uid_thread"][uid] = target
+    index["last_uid"] = max(index["last_uid"], uid)
+
+def _local_threads(imap, mailbox, uidvalidity, exists):
+    """
+    Thread the mailbox from cached Message-ID/In-Reply-To/References headers.
+    The index is kept between requests: only UIDs above the last indexed one
+    are fetched, and expunged UIDs are dropped when the message count differs.
+    """
+    with _thread_lock(mailbox):
+        index = _thread_indexes.get(mailbox)
+        if index is None or index["uidvalidity"] != uidvalidity:
+            index = {
+                "uidvalidity": uidvalidity,
+                "last_uid": 0,
+                "thread_of": {},    # Message-ID -> thread key
+                "threads": {},      # thread key -> {"ids": set, "uids": set}
+                "uid_thread": {},   # UID -> thread key
+            }
+            _thread_indexes[mailbox] = index
+
+        status, data = imap.uid("SEARCH", None, "UID", f"{index['last_uid'] + 1}:*")
+        new_uids = []
+        if status == "OK" and data and data[0]:
+            # 'n:*' always matches the highest UID, even when it is below n
+            new_uids = [uid for uid in map(int, data[0].split()) if uid > index["last_uid"]]
+
+        # batch by batch, so a first pass over a big folder never holds all summaries
+        new_uids.sort()
+        for i in range(0, len(new_uids), HEADER_FETCH_BATCH):
+            batch = new_uids[i:i + HEADER_FETCH_BATCH]
+            headers = header_summaries(imap, mailbox, uidvalidity, batch)
+            for uid in batch:
+                _thread_add(index, uid, headers.get(uid))
+
+        if len(index["uid_thread"]) != exists:
+            status, data = imap.uid("SEARCH", None, "ALL")
+            current = set(map(int, data[0].split())) if status == "OK" and data and data[0] else set()
+            for uid in set(index["uid_thread"]) - current:
+                key = index["uid_thread"].pop(uid)
+                index["threads"][key]["uids"].discard(uid)
+
+        return [sorted(t["uids"]) for t in index["threads"].values() if t["uids"]]
+
+def fetch_threads(imap, mailbox="INBOX", offset=0, limit=PAGE_SIZE):
+    """
+    Group the mailbox into conversations, newest activity first.
+    Uses the server's THREAD=REFERENCES when advertised, otherwise the local index.
+    """
+    status, _ = imap.select(mailbox, readonly=True)
+    if status != "OK":
+        return []
+    uidvalidity = _response_value(imap, "UIDVALIDITY")
+    exists = _response_value(imap, "EXISTS")
+
+    groups = None
+    if "THREAD=REFERENCES" in imap.capabilities:
+        status, data = imap.uid("THREAD", "REFERENCES", "UTF-8", "ALL")
+        if status == "OK":
+            groups = _parse_thread_response(data)
+    if groups is None:
+        groups = _local_threads(imap, mailbox, uidvalidity, exists)
+
+    groups.sort(key=max, reverse=True)
+    page = groups[offset:offset + limit]
+    headers = header_summaries(imap, mailbox, uidvalidity, [uid for g in page for uid in g])
+
+    threads = []
+    for uids in page:
+        uids = sorted(uids, reverse=True)
+        known = [headers[uid] for uid in uids if uid in headers]
+        senders = []
+        for h in known:
+            if h["sender"] and h["sender"] not in senders:
+                senders.append(h["sender"])
+        threads.append({
+            "id": str(uids[-1]),
+            "subject": known[-1]["subject"] if known else "",
+            "count": len(uids),
+            "participants": senders[:3],
+            "date_str": known[0]["date_str"] if known else "",
+            "message_ids": [str(uid) for uid in uids],
+            "account": "gmx",
+        })
+    return threads
+
+# an export FETCH is cut at either limit (by RFC822.SIZE), so memory stays at about
+# EXPORT_BATCH_BYTES; a single larger message is fetched on its own
+EXPORT_BATCH = 50
+EXPORT_BATCH_BYTES = 8 * 1024 * 1024
+# an import batch is sent once it reaches either limit
+IMPORT_BATCH = 50
+IMPORT_BATCH_BYTES = 8 * 1024 * 1024
+
+MAILDIR_FLAGS = {"\\Draft": "D", "\\Flagged": "F", "\\Answered": "R", "\\Seen": "S", "\\Deleted": "T"}
+# header lines the mbox export adds on top of each message (and the import strips again)
+MBOX_META_HEADERS = (b"x-uid:", b"status:", b"x-status:")
+
+def _iter_fetch_items(data):
+    """
+    Yield (meta, body) per message of a FETCH response. Servers may send
+    FLAGS after the literal, so the trailing bytes are folded into meta.
+    """
+    for i, item in enumerate(data or []):
+        if not isinstance(item, tuple):
+            continue
+        meta = item[0]
+        if i + 1 < len(data) and isinstance(data[i + 1], bytes):
+            meta += data[i + 1]
+        yield meta, item[1]
+
+def _fetch_meta(meta):
+    m = re.search(rb"UID (\d+)", meta)
+    uid = int(m.group(1)) if m else 0
+    m = re.search(rb"FLAGS \(([^)]*)\)", meta)
+    flags = m.group(1).decode(errors="ignore").split() if m else []
+    date = imaplib.Internaldate2tuple(meta)
+    return uid, flags, date
+
+def _mbox_record(uid, flags, date, raw):
+    """
+    One mboxrd record: From_ line, X-UID/Status/X-Status lines, then the
+    message with '>From ' quoting and LF line endings.
+    """
+    when = time.asctime(date) if date else time.asctime(time.gmtime(0))
+    status = "RO" if "\\Seen" in flags else "O"
+    x_status = "".join(c for f, c in (("\\Answered", "A"), ("\\Flagged", "F"), ("\\Deleted", "D")) if f in flags)
+
+    body = raw.replace(b"\r\n", b"\n")
+    body = re.sub(rb"(?m)^(>*From )", rb">\1", body)
+    if not body.endswith(b"\n"):
+        body += b"\n"
+
+    head = f"From MAILER-DAEMON {when}\nX-UID: {uid}\nStatus: {status}\n"
+    if x_status:
+        head += f"X-Status: {x_status}\n"
+    return head.encode() + body + b"\n"
+
+def _maildir_name(uid, flags):
+    info = "".join(sorted(c for f, c in MAILDIR_FLAGS.items() if f in flags))
+    return f"cur/{uid}.okixmail:2,{info}"
+
+class _ZipSink:
+    """
+    Write-only file object for ZipFile; collected bytes are drained after
+    every entry so the archive can be streamed without seeking.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def _export_batches(imap, uids):
+    """
+    Split 'uids' into FETCH batches of at most EXPORT_BATCH messages and
+    EXPORT_BATCH_BYTES, reading the sizes HEADER_FETCH_BATCH UIDs at a time.
+    """
+    batch = []
+    batch_bytes = 0
+    for i in range(0, len(uids), HEADER_FETCH_BATCH):
+        window = uids[i:i + HEADER_FETCH_BATCH]
+        status, data = imap.uid("FETCH", _uid_set(window), "(UID RFC822.SIZE)")
+        if status != "OK":
+            raise imaplib.IMAP4.error(f"FETCH failed for UIDs {window[0]}-{window[-1]}")
+        sizes = {}
+        for item in data or []:
+            meta = item[0] if isinstance(item, tuple) else item
+            m = re.search(rb"UID (\d+).*?RFC822\.SIZE (\d+)|RFC822\.SIZE (\d+).*?UID (\d+)", meta or b"")
+            if m:
+                uid, size = (m.group(1), m.group(2)) if m.group(1) else (m.group(4), m.group(3))
+                sizes[int(uid)] = int(size)
+
+        for uid in window:
+            size = sizes.get(uid, 0)
+            if batch and (len(batch) >= EXPORT_BATCH or batch_bytes + size > EXPORT_BATCH_BYTES):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(uid)
+            batch_bytes += size
+    if batch:
+        yield batch
+
+def export_folder(imap, mailbox, uids, fmt="mbox"):
+    """
+    Generator streaming 'uids' of the selected mailbox as mbox or zipped Maildir,
+    one record at a time, fetching batches bounded by _export_batches().
+    """
+    sink = zf = None
+    if fmt == "maildir":
+        sink = _ZipSink()
+        zf = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+
+    for batch in _export_batches(imap, uids):
+        status, data = imap.uid("FETCH", _uid_set(batch), "(UID FLAGS INTERNALDATE BODY.PEEK[])")
+        if status != "OK":
+            raise imaplib.IMAP4.error(f"FETCH failed for UIDs {batch[0]}-{batch[-1]}")
+
+        for meta, raw in _iter_fetch_items(data):
+            uid, flags, date = _fetch_meta(meta)
+            if zf is not None:
+                info = zipfile.ZipInfo(_maildir_name(uid, flags), (date or time.gmtime(0))[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, raw)
+                yield sink.drain()
+            else:
+                yield _mbox_record(uid, flags, date, raw)
+        del data
+
+    if zf is not None:
+        zf.close()
+        yield sink.drain()
+
+def _iter_mbox(stream):
+    """
+    Split an mbox(rd) byte stream into (flags, internaldate, message) without
+    reading it into memory. Undoes '>From ' quoting and the export's meta lines.
+    """
+    def finish(from_line, lines):
+        flags = []
+        date_time = None
+        try:
+            parts = from_line.decode(errors="ignore").split(None, 2)
+            date_time = imaplib.Time2Internaldate(time.mktime(time.strptime(parts[2].strip())))
+        except (IndexError, ValueError, OverflowError):
+            pass
+
+        body = []
+        in_header = True
+        for line in lines:
+            if in_header:
+                if not line.strip():
+                    in_header = False
+                else:
+                    lower = line.lower()
+                    if lower.startswith(MBOX_META_HEADERS):
+                        value = line.split(b":", 1)[1]
+                        if lower.startswith(b"status:") and b"R" in value:
+                            flags.append("\\Seen")
+                        elif lower.startswith(b"x-status:"):
+                            if b"A" in value:
+                                flags.append("\\Answered")
+                            if b"F" in value:
+                                flags.append("\\Flagged")
+                        continue
+            body.append(line)
+
+        # the record separator is the blank line before the next From_
+        if body and not body[-1].strip():
+            body.pop()
+        return " ".join(flags), date_time, b"".join(body)
+
+    from_line = None
+    lines = []
+    prev_blank = True
+    for line in stream:
+        if line.startswith(b"From ") and prev_blank:
+            if from_line is not None:
+                yield finish(from_line, lines)
+            from_line = line
+            lines = []
+        elif from_line is not None:
+            if re.match(rb">+From ", line):
+                line = line[1:]
+            lines.append(line)
+        prev_blank = not line.strip()
+
+    if from_line is not None:
+        yield finish(from_line, lines)
+
+def _append_literal(flags, date_time, data):
+    data = re.sub(rb"\r?\n", b"\r\n", data)
+    args = f" ({flags})" + (f" {date_time}" if date_time else "")
+    return args.encode() + b" {%d+}\r\n" % len(data) + data
+
+def _append_each(imap, mailbox, batch):
+    for flags, date_time, data in batch:
+        try:
+            typ, resp = imap.append(_imap_quote(mailbox), f"({flags})" if flags else None, date_time, data)
+        except imap.abort:
+            raise
+        except imap.error as e:
+            typ, resp = "NO", str(e)
+        yield None if typ == "OK" else f"APPEND failed: {resp}"
+
+def append_batch(imap, mailbox, batch):
+    """
+    APPEND a batch of (flags, internaldate, message) tuples, yielding one result
+    per message in batch order: None once stored, the server's error otherwise.
+    With LITERAL+ the whole batch goes out in one write: a single MULTIAPPEND
+    command when the server supports it, otherwise pipelined APPENDs.
+    """
+    caps = imap.capabilities
+    if "LITERAL+" not in caps:
+        yield from _append_each(imap, mailbox, batch)
+        return
+
+    target = _imap_quote(mailbox).encode()
+    if "MULTIAPPEND" in caps:
+        tag = imap._new_tag()
+        literals = b"".join(_append_literal(*m) for m in batch)
+        imap.send(tag + b" APPEND " + target + literals + b"\r\n")
+        try:
+            typ, _ = imap._command_complete("APPEND", tag)
+        except imap.abort:
+            raise
+        except imap.error:
+            typ = "BAD"
+        if typ == "OK":
+            yield from (None for _ in batch)
+        else:
+            # MULTIAPPEND is all or nothing, so find the bad message one at a time
+            yield from _append_each(imap, mailbox, batch)
+        return
+
+    tags = []
+    commands = []
+    for m in batch:
+        tag = imap._new_tag()
+        tags.append(tag)
+        commands.append(tag + b" APPEND " + target + _append_literal(*m) + b"\r\n")
+    imap.send(b"".join(commands))
+
+    # every tag gets read, a rejected message must not leave the others' replies queued
+    for tag in tags:
+        try:
+            typ, data = imap._command_complete("APPEND", tag)
+        except imap.abort:
+            raise
+        except imap.error as e:
+            typ, data = "BAD", str(e)
+        yield None if typ == "OK" else f"APPEND failed: {data}"
+
+def _store_batch(imap, mailbox, batch, progress):
+    for error in append_batch(imap, mailbox, batch):
+        progress["processed"] += 1
+        if error:
+            progress["failed"].append(progress["processed"])
+        else:
+            progress["imported"] += 1
+
+def import_mbox(imap, mailbox, stream, skip=0):
+    """
+    Generator importing an mbox stream into 'mailbox', yielding progress dicts
+    after every batch. 'processed' counts the messages the server has answered
+    for, 'failed' lists the (1-based) ones it rejected. 'skip' resumes an
+    interrupted import by ignoring that many leading messages ('processed'
+    from the last progress line, including the error line).
+    """
+    progress = {"processed": skip, "imported": 0, "failed": []}
+    seen = 0
+    batch = []
+    batch_bytes = 0
+
+    try:
+        for message in _iter_mbox(stream):
+            seen += 1
+            if seen <= skip:
+                continue
+
+            batch.append(message)
+            batch_bytes += len(message[2])
+            if len(batch) >= IMPORT_BATCH or batch_bytes >= IMPORT_BATCH_BYTES:
+                _store_batch(imap, mailbox, batch, progress)
+                batch = []
+                batch_bytes = 0
+                yield {**progress, "failed": list(progress["failed"])}
+
+        if batch:
+            _store_batch(imap, mailbox, batch, progress)
+    except Exception as e:
+        # counts stop at the last message the server confirmed or rejected
+        yield {"error": str(e), **progress}
+        return
+    yield {"status": "done", **progress}
+
+# per-message part maps kept for inline image/attachment requests, least recently used dropped first
+PART_MAP_CACHE_SIZE = 500
+
+# (mailbox, uidvalidity, uid) -> {"cids": {content-id: part}, "attachments": [part or None]}
+# where part = {section, content_type, encoding}
+_part_maps = OrderedDict()
+_part_maps_lock = threading.Lock()
+
+def _iter_sections(part, section=""):
+    """
+    Yield (section, part) for every leaf part, numbered like IMAP BODY[<section>]
+    specifiers ('1', '2.1', ...). An attached message/rfc822 takes the number of
+    its container, its body parts continue below it.
+    """
+    if part.get_content_type() == "message/rfc822" and part.is_multipart():
+        inner = part.get_payload()[0]
+        if inner.is_multipart():
+            yield from _iter_sections(inner, section)
+        else:
+            yield f"{section}.1", inner
+    elif part.is_multipart():
+        for i, sub in enumerate(part.get_payload(), 1):
+            yield from _iter_sections(sub, f"{section}.{i}" if section else str(i))
+    else:
+        yield section or "1", part
+
+def _part_info(section, part):
+    return {
+        "section": section,
+        "content_type": part.get_content_type(),
+        "encoding": (part.get("Content-Transfer-Encoding") or "").strip().lower(),
+    }
+
+def build_part_map(msg):
+    """
+    Map each Content-ID (without angle brackets) to the part that carries it,
+    and each attachment index (as numbered by api_message) to its part.
+    """
+    sections = {id(part): section for section, part in _iter_sections(msg)}
+
+    cids = {}
+    for section, part in _iter_sections(msg):
+        cid = (part.get("Content-ID") or "").strip().strip("<>")
+        if cid:
+            cids[cid] = _part_info(section, part)
+
+    # same walk and test as api_message(), so the indexes line up
+    attachments = []
+    for part in msg.walk():
+        if part.get_filename() and part.get_content_disposition() in ("attachment", "inline"):
+            section = sections.get(id(part))
+            attachments.append(_part_info(section, part) if section else None)
+
+    return {"cids": cids, "attachments": attachments}
+
+def get_part_map(imap, folder, uidvalidity, uid):
+    """
+    Cached part map of a message in the selected folder; fetches and parses the
+    message once when it isn't cached. Returns None if the message is gone.
+    """
+    key = (folder, uidvalidity, uid)
+    with _part_maps_lock:
+        parts = _part_maps.get(key)
+        if parts is not None:
+            _part_maps.move_to_end(key)
+    if parts is None:
+        status, msg_data = imap.uid("FETCH", uid, "(BODY.PEEK[])")
+        if status != "OK" or not msg_data or not msg_data[0]:
+            return None
+        parts = build_part_map(email.message_from_bytes(msg_data[0][1]))
+        remember_part_map(key, parts)
+    return parts
+
+def fetch_part(imap, uid, part):
+    """
+    Fetch and decode a single body part with a partial BODY.PEEK[<section>].
+    """
+    status, data = imap.uid("FETCH", uid, f"(BODY.PEEK[{part['section']}])")
+    raw = next((item[1] for item in _iter_fetch_items(data)), None) if status == "OK" else None
+    if raw is None:
+        return None
+    return decode_part_payload(raw, part["encoding"])
+
+def remember_part_map(key, parts):
+    with _part_maps_lock:
+        _part_maps[key] = parts
+        _part_maps.move_to_end(key)
+        while len(_part_maps) > PART_MAP_CACHE_SIZE:
+            _part_maps.popitem(last=False)
+
+def decode_part_payload(raw, encoding):
+    if encoding == "base64":
+        return base64.b64decode(raw)
+    if encoding == "quoted-printable":
+        return quopri.decodestring(raw)
+    return raw
+
+def rewrite_cid_urls(html, account, uid, folder, uidvalidity):
+    """
+    Point src="cid:..." attributes at /api/message/.../cid/<id>. The URL carries
+    the folder's UIDVALIDITY, which is what makes it safe to cache for good.
+    """
+    def repl(match):
+        url = url_for(
+            "api_message_cid", account=account, id=uid, cid=match.group(3),
+            folder=folder, uidvalidity=uidvalidity,
+        )
+        return f"{match.group(1)}{match.group(2)}{url}{match.group(2)}"
+
+    return re.sub(r'(\bsrc\s*=\s*)(["\'])cid:([^"\']+)\2', repl, html, flags=re.IGNORECASE)
+
+THUMB_SIZE = 160
+THUMB_WORKERS = 2
+# how long a request waits for its thumbnail before giving up
+THUMB_TIMEOUT = 20
+THUMB_CACHE_DIR = os.getenv(
+    "THUMB_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".thumb-cache")
+)
+THUMB_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_thumb_pool = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="thumb")
+# cache path -> Future, so concurrent requests for one thumbnail render it once
+_thumb_jobs = {}
+_thumb_lock = threading.Lock()
+
+def thumb_cache_path(folder, uidvalidity, uid, att_index):
+    key = f"{folder}\0{uidvalidity}\0{uid}\0{att_index}".encode()
+    return os.path.join(THUMB_CACHE_DIR, hashlib.sha256(key).hexdigest() + ".jpg")
+
+def _prune_thumb_cache():
+    """
+    Delete the least recently used thumbnails (by mtime, bumped on every hit)
+    until the cache fits in THUMB_CACHE_MAX_BYTES.
+    """
+    entries = []
+    total = 0
+    for entry in os.scandir(THUMB_CACHE_DIR):
+        if entry.is_file() and entry.name.endswith(".jpg"):
+            st = entry.stat()
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+    for _, size, path in sorted(entries):
+        if total <= THUMB_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def _render_thumbnail(payload, path):
+    """
+    Worker job: scale an image down to THUMB_SIZE and store it as JPEG at 'path'.
+    """
+    img = Image.open(BytesIO(payload))
+    img.draft("RGB", (THUMB_SIZE, THUMB_SIZE))   # lets JPEG decode at reduced scale
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    os.makedirs(THUMB_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    img.save(tmp, "JPEG", quality=80, optimize=True)
+    os.replace(tmp, path)
+    _prune_thumb_cache()
+    return path
+
+def render_thumbnail(payload, path):
+    """
+    Render on the worker pool and wait for it; joins an identical job in flight.
+    """
+    with _thumb_lock:
+        job = _thumb_jobs.get(path)
+        if job is None:
+            job = _thumb_pool.submit(_render_thumbnail, payload, path)
+            _thumb_jobs[path] = job
+            job.add_done_callback(lambda _: _thumb_jobs.pop(path, None))
+    return job.result(timeout=THUMB_TIMEOUT)
+
 @app.route("/api/messages", methods=["GET"])
 def api_messages():
     try:
         folder = request.args.get("folder", "INBOX")
+        offset = max(request.args.get("offset", 0, type=int), 0)
+        limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        sort = request.args.get("sort", "date")
+        reverse = request.args.get("order", "desc") != "asc"
+        filter_name = request.args.get("filter", "all")
+        sender = request.args.get("from")
+
+        if sort not in SORT_KEYS:
+            return jsonify({"error": f"Unknown sort '{sort}'"}), 400
+        if filter_name not in SEARCH_FILTERS:
+            return jsonify({"error": f"Unknown filter '{filter_name}'"}), 400
+
+        criteria = list(SEARCH_FILTERS[filter_name])
+        if sender:
+            # imaplib only takes ASCII arguments; anything else goes as a UTF-8 literal
+            criteria += ["FROM", _imap_quote(sender) if sender.isascii() else sender.encode("utf-8")]
+
         imap = connect_imap()
-        emails = fetch_emails(imap, mailbox=folder)
+        emails, total = fetch_emails(
+            imap, mailbox=folder, offset=offset, limit=limit,
+            sort=sort, reverse=reverse, criteria=criteria,
+        )
         imap.logout()
-        return jsonify(emails)
+        response = conditional_json(emails)
+        response.headers["X-Total-Count"] = str(total)
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -346,7 +1726,7 @@ def api_messages():
 def api_inbox():
     try:
         imap = connect_imap()
-        emails = fetch_emails(imap)
+        emails, _ = fetch_emails(imap)
         imap.logout()
         total_count = len(emails)
         total_unread = sum(1 for email in emails if email["unread"])
@@ -357,6 +1737,28 @@ def api_inbox():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/threads", methods=["GET"])
+def api_threads():
+    try:
+        folder = request.args.get("folder", "INBOX")
+        offset = max(request.args.get("offset", 0, type=int), 0)
+        limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        imap = connect_imap()
+        threads = fetch_threads(imap, mailbox=folder, offset=offset, limit=limit)
+        imap.logout()
+        return conditional_json(threads)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/contacts", methods=["GET"])
+def api_contacts():
+    """
+    Recipient autocomplete: ?prefix= matches the start of an address, name or name word.
+    """
+    prefix = request.args.get("prefix", "")
+    limit = min(max(request.args.get("limit", CONTACT_SUGGEST_LIMIT, type=int), 1), CONTACT_SUGGEST_LIMIT)
+    return jsonify({"contacts": suggest_contacts(prefix, limit)})
+
 @app.route("/api/folders", methods=["GET"])
 def api_folders():
     try:
@@ -367,6 +1769,88 @@ def api_folders():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/folders/<path:key>/export", methods=["GET"])
+def api_export_folder(key):
+    """
+    Stream a folder as mbox (default) or zipped Maildir (?format=maildir).
+
+    Messages go out in ascending UID order; an interrupted export is resumed
+    with ?since_uid=<last X-UID received>, as long as X-UIDVALIDITY is unchanged.
+    """
+    imap = None
+    try:
+        fmt = request.args.get("format", "mbox")
+        since_uid = max(request.args.get("since_uid", 0, type=int), 0)
+        if fmt not in ("mbox", "maildir"):
+            return jsonify({"error": f"Unknown format '{fmt}'"}), 400
+
+        imap = connect_imap()
+        typ, _ = imap.select(key, readonly=True)
+        if typ != "OK":
+            imap.logout()
+            return jsonify({"error": f"Could not select folder {key}"}), 500
+        uidvalidity = _response_value(imap, "UIDVALIDITY")
+
+        typ, data = imap.uid("SEARCH", None, "UID", f"{since_uid + 1}:*")
+        uids = []
+        if typ == "OK" and data and data[0]:
+            uids = sorted(uid for uid in map(int, data[0].split()) if uid > since_uid)
+    except Exception as e:
+        if imap is not None:
+            try:
+                imap.logout()
+            except Exception:
+                pass
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        try:
+            yield from export_folder(imap, key, uids, fmt)
+        finally:
+            try:
+                imap.logout()
+            except Exception:
+                pass
+
+    name = re.sub(r"[^\w.-]+", "_", decode_imap_utf7(key), flags=re.ASCII) or "folder"
+    if fmt == "maildir":
+        mimetype, filename = "application/zip", f"{name}.maildir.zip"
+    else:
+        mimetype, filename = "application/mbox", f"{name}.mbox"
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["X-Message-Count"] = str(len(uids))
+    response.headers["X-UIDVALIDITY"] = str(uidvalidity)
+    return response
+
+@app.route("/api/folders/<path:key>/import", methods=["POST"])
+def api_import_folder(key):
+    """
+    APPEND an mbox request body to a folder, streaming newline-delimited JSON
+    progress lines. Resume an interrupted import with ?skip=<processed>.
+    """
+    skip = max(request.args.get("skip", 0, type=int), 0)
+    try:
+        imap = connect_imap()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        progress = {"processed": skip, "imported": 0, "failed": []}
+        try:
+            for progress in import_mbox(imap, key, request.stream, skip=skip):
+                yield json.dumps(progress) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e), **progress}) + "\n"
+        finally:
+            try:
+                imap.logout()
+            except Exception:
+                pass
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route("/api/message/<account>/<id>", methods=["GET"])
 def api_message(account, id):
     """
@@ -382,8 +1866,10 @@ def api_message(account, id):
         if typ != "OK":
             imap.logout()
             return jsonify({"error": f"Could not select folder {folder}"}), 500
+        uidvalidity = _response_value(imap, "UIDVALIDITY")
 
-        status, msg_data = imap.fetch(id, "(RFC822)")
+        # PEEK so that prefetching a message doesn't flag it as read
+        status, msg_data = imap.uid("FETCH", id, "(BODY.PEEK[])")
         if status != "OK" or not msg_data or not msg_data[0]:
             imap.logout()
             return jsonify({"error": "Message not found"}), 404
@@ -460,17 +1946,23 @@ def api_message(account, id):
                 elif ctype == "text/html":
                     html_body = text
 
+        # Inline images are served per part later; remember where each one lives
+        part_map = build_part_map(msg)
+        remember_part_map((folder, uidvalidity, id), part_map)
+        if html_body and part_map["cids"]:
+            html_body = rewrite_cid_urls(html_body, account, id, folder, uidvalidity)
+
         body = html_body or plain_body or ""
 
         if mark_read:
             try:
-                imap.store(id, "+FLAGS", "\\Seen")
+                imap.uid("STORE", id, "+FLAGS", "\\Seen")
                 imap.expunge()
             except Exception:
                 pass
 
         imap.logout()
-        return jsonify({
+        return conditional_json({
             "subject": subject,
             "sender": sender,
             "to": receiver,
@@ -480,6 +1972,9 @@ def api_message(account, id):
             "folder": folder,
             "attachments": attachments,
             "priority": priority,
+            "uidvalidity": uidvalidity,
+            # lets the client skip /thumb requests that could only answer 501
+            "thumbnails": Image is not None,
         })
     except Exception as e:
         if imap is not None:
@@ -489,6 +1984,95 @@ def api_message(account, id):
                 pass
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/message/<account>/<id>/cid/<path:cid>", methods=["GET"])
+def api_message_cid(account, id, cid):
+    """
+    Serve an inline (cid:) image of a message with a partial BODY.PEEK[<section>]
+    fetch. Only raster images are served; anything else could run script on
+    our origin. The part is immutable for a given UIDVALIDITY and UID, so a
+    request naming the current ?uidvalidity= is cached long-term.
+    """
+    imap = None
+    try:
+        folder = request.args.get("folder", "INBOX")
+        requested_uidvalidity = request.args.get("uidvalidity", type=int)
+        # cid: URLs are percent-encoded (RFC 2392), Content-ID headers are not
+        cid = unquote(cid)
+
+        imap = connect_imap()
+        typ, _ = imap.select(folder, readonly=True)
+        if typ != "OK":
+            imap.logout()
+            return jsonify({"error": f"Could not select folder {folder}"}), 500
+        uidvalidity = _response_value(imap, "UIDVALIDITY")
+        if requested_uidvalidity is not None and requested_uidvalidity != uidvalidity:
+            imap.logout()
+            return jsonify({"error": "Message not found"}), 404
+
+        parts = get_part_map(imap, folder, uidvalidity, id)
+        if parts is None:
+            imap.logout()
+            return jsonify({"error": "Message not found"}), 404
+
+        part = parts["cids"].get(cid)
+        if part is None:
+            imap.logout()
+            return jsonify({"error": "Inline part not found"}), 404
+        ctype = part["content_type"]
+        if not ctype.startswith("image/") or ctype == "image/svg+xml":
+            imap.logout()
+            return jsonify({"error": "Inline part is not an image"}), 415
+
+        payload = fetch_part(imap, id, part)
+        imap.logout()
+        if payload is None:
+            return jsonify({"error": "Inline part not found"}), 404
+
+        response = send_file(BytesIO(payload), mimetype=ctype)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        if requested_uidvalidity is not None:
+            response.cache_control.private = True
+            response.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
+    except Exception as e:
+        if imap is not None:
+            try:
+                imap.logout()
+            except Exception:
+                pass
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/message/<account>/<id>/read", methods=["POST"])
+def api_mark_read(account, id):
+    """
+    Set \\Seen on a message without fetching it, for messages the client
+    already has cached.
+    """
+    imap = None
+    try:
+        folder = request.args.get("folder", "INBOX")
+
+        imap = connect_imap()
+        typ, _ = imap.select(folder)
+        if typ != "OK":
+            imap.logout()
+            return jsonify({"error": f"Could not select folder {folder}"}), 500
+
+        typ, _ = imap.uid("STORE", id, "+FLAGS", "\\Seen")
+        imap.logout()
+        if typ != "OK":
+            return jsonify({"error": "Could not mark message as read"}), 500
+        return jsonify({"status": "read", "id": id})
+    except Exception as e:
+        if imap is not None:
+            try:
+                imap.logout()
+            except Exception:
+                pass
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/api/message/<account>/<id>/delete", methods=["POST"])
 def api_delete_message(account, id):
     """
@@ -514,7 +2098,7 @@ def api_delete_message(account, id):
         # Grab Message-ID from header so we can find the copy in trash later
         message_id = None
         try:
-            typ, data = imap.fetch(id, "(BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])")
+            typ, data = imap.uid("FETCH", id, "(BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])")
             if typ == "OK" and data and data[0]:
                 header_bytes = data[0][1]
                 header_msg = email.message_from_bytes(header_bytes)
@@ -527,13 +2111,13 @@ def api_delete_message(account, id):
 
         # If we're not already in the trash, copy the message there first
         if restorable:
-            copy_typ, _ = imap.copy(id, trash_folder)
+            copy_typ, _ = imap.uid("COPY", id, trash_folder)
             if copy_typ != "OK":
                 imap.logout()
                 return jsonify({"error": "Could not move message to trash"}), 500
 
         # Now mark the message as deleted in the current folder
-        imap.store(id, "+FLAGS", r"(\Deleted)")
+        imap.uid("STORE", id, "+FLAGS", r"(\Deleted)")
         imap.expunge()
         imap.logout()
 
@@ -582,23 +2166,23 @@ def api_restore_message(account, id):
 
         mid = message_id.replace('"', "").strip()
         search_crit = f'"{mid}"'
-        typ, search_data = imap.search(None, "HEADER", "Message-ID", search_crit)
+        typ, search_data = imap.uid("SEARCH", None, "HEADER", "Message-ID", search_crit)
         if typ != "OK" or not search_data or not search_data[0]:
             imap.logout()
             return jsonify({"error": "Message not found in trash"}), 404
 
         # If multiple hits, use the last one
         candidates = search_data[0].split()
-        msg_seq = candidates[-1].decode() if isinstance(candidates[-1], (bytes, bytearray)) else str(candidates[-1])
+        msg_uid = candidates[-1].decode() if isinstance(candidates[-1], (bytes, bytearray)) else str(candidates[-1])
 
         # Copy back to the original folder
-        typ, _ = imap.copy(msg_seq, from_folder)
+        typ, _ = imap.uid("COPY", msg_uid, from_folder)
         if typ != "OK":
             imap.logout()
             return jsonify({"error": "Could not copy message back to folder"}), 500
 
         # Remove it from trash
-        imap.store(msg_seq, "+FLAGS", r"(\Deleted)")
+        imap.uid("STORE", msg_uid, "+FLAGS", r"(\Deleted)")
         imap.expunge()
         imap.logout()
 
@@ -622,7 +2206,7 @@ def api_attachment(account, id, att_index):
     imap = connect_imap()
     try:
         imap.select(folder)
-        status, msg_data = imap.fetch(id, "(RFC822)")
+        status, msg_data = imap.uid("FETCH", id, "(RFC822)")
         if status != "OK" or not msg_data:
             return jsonify({"error": "Message not found"}), 404
 
@@ -672,6 +2256,93 @@ def api_attachment(account, id, att_index):
         except Exception:
             pass
 
+@app.route("/api/message/<account>/<id>/attachment/<int:att_index>/thumb", methods=["GET"])
+def api_attachment_thumb(account, id, att_index):
+    """
+    Small JPEG preview of an image attachment, kept in a size-bounded disk cache.
+
+    When the client passes the folder's ?uidvalidity= (from api_message), a
+    cached thumbnail is served without connecting to IMAP at all.
+    """
+    if Image is None:
+        return jsonify({"error": "Thumbnails need the Pillow package"}), 501
+
+    folder = request.args.get("folder", "INBOX")
+    uidvalidity = request.args.get("uidvalidity", type=int)
+
+    def send_thumb(path):
+        """
+        None when the file is gone, e.g. pruned by another request since the check.
+        """
+        try:
+            os.utime(path)   # mark as recently used for the cache pruning
+            response = send_file(path, mimetype="image/jpeg")
+        except FileNotFoundError:
+            return None
+        response.cache_control.private = True
+        response.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+        return response
+
+    if uidvalidity is not None:
+        response = send_thumb(thumb_cache_path(folder, uidvalidity, id, att_index))
+        if response is not None:
+            return response
+
+    imap = None
+    try:
+        imap = connect_imap()
+        typ, _ = imap.select(folder, readonly=True)
+        if typ != "OK":
+            imap.logout()
+            return jsonify({"error": f"Could not select folder {folder}"}), 500
+        uidvalidity = _response_value(imap, "UIDVALIDITY")
+
+        path = thumb_cache_path(folder, uidvalidity, id, att_index)
+        response = send_thumb(path)
+        if response is not None:
+            imap.logout()
+            return response
+
+        parts = get_part_map(imap, folder, uidvalidity, id)
+        if parts is None:
+            imap.logout()
+            return jsonify({"error": "Message not found"}), 404
+
+        attachments = parts["attachments"]
+        part = attachments[att_index] if att_index < len(attachments) else None
+        if part is None:
+            imap.logout()
+            return jsonify({"error": "Attachment not found"}), 404
+        if not part["content_type"].startswith("image/"):
+            imap.logout()
+            return jsonify({"error": "No preview for this attachment type"}), 415
+
+        payload = fetch_part(imap, id, part)
+        imap.logout()
+        imap = None
+        if payload is None:
+            return jsonify({"error": "Attachment not found"}), 404
+
+        try:
+            render_thumbnail(payload, path)
+        except FutureTimeoutError:
+            return jsonify({"error": "Preview is still being rendered"}), 503, {"Retry-After": str(THUMB_TIMEOUT)}
+        except Exception:
+            return jsonify({"error": "Could not render a preview"}), 415
+        response = send_thumb(path)
+        if response is None:
+            return jsonify({"error": "Preview is not available right now"}), 503
+        return response
+    except Exception as e:
+        if imap is not None:
+            try:
+                imap.logout()
+            except Exception:
+                pass
+        return jsonify({"error": str(e)}), 500
+
 def extract_data_uri_attachments_from_html(html):
     """
     Find <img src="data:..."> tags, turn them into attachments, and
@@ -791,6 +2462,8 @@ def api_send():
     if cc_list:
         msg["Cc"] = ", ".join(cc_list)
     msg["Subject"] = subject
+    # the Sent copy keeps this id, so listing it doesn't count the recipients again
+    msg["Message-ID"] = make_msgid(domain=(EMAIL_ACCOUNT or "").rpartition("@")[2] or None)
 
     # ---- Priority headers ----
     if priority == "high":
@@ -843,6 +2516,12 @@ def api_send():
         server.sendmail(EMAIL_ACCOUNT, recipients, raw_msg_bytes)
         server.quit()
 
+        record_contacts(
+            [", ".join(to_list + cc_list + bcc_list)],
+            message_id=msg["Message-ID"],
+            weight=CONTACT_SENT_WEIGHT,
+        )
+
         # --- Save copy to Sent (IMAP) ---
         try:
             imap = connect_imap()
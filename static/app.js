@@ -6,9 +6,37 @@ const state = {
   selectedMessage: null,
   lastDeleted: null,
   composeAttachments: [],
+  // loaded rows of the current folder; the DOM only holds the visible window
+  messages: [],
+  loadedCount: 0,
+  total: null,
+  hasMore: false,
+  loadingMore: false,
+  listGeneration: 0,
 };
 const TRASH_KEY = "Gel&APY-scht";
 
+// how many messages above/below the selection get prefetched
+const PREFETCH_AHEAD = 3;
+const RESPONSE_CACHE_LIMIT = 200;
+
+// key -> { etag, data }; Map keeps insertion order, so the first entry is the oldest
+const responseCache = new Map();
+let countsRefreshTimer = null;
+let prefetchQueue = [];
+let prefetchRunning = false;
+
+// keep ROW_HEIGHT in sync with .messages.virtual .message-row in styles.css
+const ROW_HEIGHT = 80;
+const ROW_OVERSCAN = 6;
+const MESSAGE_PAGE_SIZE = 50;
+// start fetching the next page when this many loaded rows remain below the viewport
+const LOAD_MORE_THRESHOLD = 20;
+
+const rowPool = [];
+const rowMessages = new WeakMap();
+let listFrame = null;
+
 const $  = (sel, root = document) => root.querySelector(sel);
 const $$ = (sel, root = document) => Array.from(root.querySelectorAll(sel));
 
@@ -88,6 +116,119 @@ function priorityLabel(p) {
   return "Normal";
 }
 
+// --- Response cache (ETag revalidation) ---
+
+function listCacheKey(folder) {
+  return `${folder}|list`;
+}
+
+function messageCacheKey(folder, account, id) {
+  return `${folder}|msg|${account}|${id}`;
+}
+
+function rememberResponse(key, etag, data, total = null) {
+  responseCache.delete(key);
+  responseCache.set(key, { etag, data, total });
+  while (responseCache.size > RESPONSE_CACHE_LIMIT) {
+    responseCache.delete(responseCache.keys().next().value);
+  }
+}
+
+// Message ids are UIDs, so cached details stay valid; only the list page goes stale
+function invalidateFolderCache(folder) {
+  responseCache.delete(listCacheKey(folder));
+}
+
+/**
+ * GET a JSON resource, revalidating any cached copy with If-None-Match.
+ * Resolves to { data, changed, total } where changed is false on a 304 and
+ * total is the X-Total-Count header (null when the endpoint doesn't send it).
+ */
+async function fetchJsonCached(url, key, priority = "auto") {
+  const cached = responseCache.get(key);
+  const headers = {};
+  if (cached && cached.etag) headers["If-None-Match"] = cached.etag;
+
+  const res = await fetch(url, { headers, priority });
+  if (res.status === 304 && cached) {
+    rememberResponse(key, cached.etag, cached.data, cached.total);
+    return { data: cached.data, changed: false, total: cached.total };
+  }
+
+  const data = await res.json();
+  if (!res.ok || (data && data.error)) {
+    throw new Error((data && data.error) || res.statusText);
+  }
+  const totalHeader = res.headers.get("X-Total-Count");
+  const total = totalHeader === null ? null : Number(totalHeader);
+  rememberResponse(key, res.headers.get("ETag"), data, total);
+  return { data, changed: true, total };
+}
+
+function messageUrl(account, id, folder, markRead) {
+  return `/api/message/${encodeURIComponent(account)}/${encodeURIComponent(id)}` +
+    `?mark_read=${markRead ? 1 : 0}&folder=${encodeURIComponent(folder)}`;
+}
+
+function whenIdle(cb) {
+  if (typeof window.requestIdleCallback === "function") {
+    window.requestIdleCallback(cb, { timeout: 1000 });
+  } else {
+    setTimeout(cb, 200);
+  }
+}
+
+// Warm the cache with the neighbours of the selected row. Each prefetch is an
+// IMAP login on the server, so they run one at a time and a new selection
+// replaces whatever is still queued.
+function prefetchAdjacent(account, id) {
+  const msgs = state.messages;
+  const idx = messageIndex(account, id);
+  if (idx < 0) return;
+
+  const folder = state.folder || "INBOX";
+  const targets = [];
+  for (let d = 1; d <= PREFETCH_AHEAD; d++) {
+    if (msgs[idx + d]) targets.push({ folder, account: msgs[idx + d].account, id: msgs[idx + d].id });
+    if (msgs[idx - d]) targets.push({ folder, account: msgs[idx - d].account, id: msgs[idx - d].id });
+  }
+
+  prefetchQueue = targets;
+  if (!prefetchRunning) whenIdle(drainPrefetchQueue);
+}
+
+async function drainPrefetchQueue() {
+  if (prefetchRunning) return;
+  prefetchRunning = true;
+  try {
+    while (prefetchQueue.length) {
+      const t = prefetchQueue.shift();
+      const key = messageCacheKey(t.folder, t.account, t.id);
+      if (responseCache.has(key)) continue;
+      await fetchJsonCached(messageUrl(t.account, t.id, t.folder, false), key, "low")
+        .catch(() => {});
+    }
+  } finally {
+    prefetchRunning = false;
+  }
+}
+
+// Flag a cached message as read without refetching it
+function markReadOnServer(account, id, folder) {
+  return fetch(
+    `/api/message/${encodeURIComponent(account)}/${encodeURIComponent(id)}/read?folder=${encodeURIComponent(folder)}`,
+    { method: "POST" }
+  ).catch(err => console.error("Failed to mark message read", err));
+}
+
+// Counts hit every folder on the server; batch them while the user is navigating
+function scheduleCountsRefresh() {
+  clearTimeout(countsRefreshTimer);
+  countsRefreshTimer = setTimeout(() => {
+    loadInboxCounts().then(loadFolders).catch(err => console.error("Failed to refresh counts", err));
+  }, 500);
+}
+
 // --- helpers for attachments ---
 
 function readFileAsBase64(file) {
@@ -146,6 +287,110 @@ function renderComposeAttachments() {
   });
 }
 
+// --- Recipient autocomplete ---
+
+const CONTACT_SUGGEST_DELAY = 60;
+
+// suggestion value for a contact; names with separators would be split by the server
+function contactToken(c) {
+  return c.name && !/[,;"<>]/.test(c.name) ? `${c.name} <${c.address}>` : c.address;
+}
+
+function attachContactAutocomplete(input) {
+  if (!input) return;
+
+  const box = document.createElement("ul");
+  box.className = "contact-suggestions";
+  box.hidden = true;
+  input.parentElement.appendChild(box);
+
+  let items = [];
+  let active = -1;
+  let timer = null;
+  let controller = null;
+
+  const close = () => {
+    box.hidden = true;
+    items = [];
+    active = -1;
+  };
+
+  // only the address after the last comma/semicolon is being typed
+  const currentPrefix = () => {
+    const parts = input.value.split(/[,;]/);
+    return parts[parts.length - 1].trim();
+  };
+
+  const pick = (c) => {
+    const parts = input.value.split(/[,;]/);
+    parts[parts.length - 1] = ` ${contactToken(c)}`;
+    input.value = parts.join(",").replace(/^\s+/, "") + ", ";
+    close();
+    input.focus();
+  };
+
+  const render = () => {
+    box.innerHTML = items.map((c, i) => `
+      <li class="contact-suggestion ${i === active ? "active" : ""}" data-index="${i}">
+        ${c.name ? `<span class="contact-name">${escapeHtml(c.name)}</span>` : ""}
+        <span class="contact-address">${escapeHtml(c.address)}</span>
+      </li>
+    `).join("");
+    box.hidden = items.length === 0;
+  };
+
+  const lookup = async () => {
+    const prefix = currentPrefix();
+    if (!prefix) {
+      close();
+      return;
+    }
+
+    if (controller) controller.abort();
+    controller = new AbortController();
+    try {
+      const res = await fetch(`/api/contacts?prefix=${encodeURIComponent(prefix)}`, {
+        signal: controller.signal,
+      });
+      const data = await res.json();
+      items = Array.isArray(data.contacts) ? data.contacts : [];
+      active = items.length ? 0 : -1;
+      render();
+    } catch (err) {
+      if (err.name !== "AbortError") console.error("Contact lookup failed", err);
+    }
+  };
+
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    timer = setTimeout(lookup, CONTACT_SUGGEST_DELAY);
+  });
+
+  input.addEventListener("keydown", (e) => {
+    if (box.hidden || !items.length) return;
+    if (e.key === "ArrowDown" || e.key === "ArrowUp") {
+      e.preventDefault();
+      active = (active + (e.key === "ArrowDown" ? 1 : -1) + items.length) % items.length;
+      render();
+    } else if ((e.key === "Enter" || e.key === "Tab") && active >= 0) {
+      e.preventDefault();
+      pick(items[active]);
+    } else if (e.key === "Escape") {
+      close();
+    }
+  });
+
+  // mousedown fires before blur, so the pick isn't lost to the blur handler
+  box.addEventListener("mousedown", (e) => {
+    const li = e.target.closest(".contact-suggestion");
+    if (!li) return;
+    e.preventDefault();
+    pick(items[Number(li.dataset.index)]);
+  });
+
+  input.addEventListener("blur", close);
+}
+
 // --- Compose ("Write") ---
 function openCompose() {
   state.selectedMessage = null;
@@ -169,7 +414,7 @@ function openCompose() {
       <div class="compose-fields">
         <div class="compose-field">
           <label for="composeTo">To</label>
-          <input id="composeTo" type="email" placeholder="recipient@example.com" autocomplete="email" />
+          <input id="composeTo" type="text" placeholder="recipient@example.com" />
         </div>
         <div class="compose-field">
           <label for="composeCc">Cc</label>
@@ -228,6 +473,12 @@ function openCompose() {
   state.composeAttachments = [];
   renderComposeAttachments();
 
+  ["composeTo", "composeCc", "composeBcc"].forEach(id => {
+    const input = document.getElementById(id);
+    if (input) input.setAttribute("autocomplete", "off");
+    attachContactAutocomplete(input);
+  });
+
   const editor = document.getElementById("composeEditor");
   if (editor) {
     editor.addEventListener("dragover", (e) => {
@@ -413,56 +664,214 @@ async function loadInboxCounts() {
 
 async function loadMessages(account) {
   const folder = state.folder || "INBOX";
-  let res;
+  const key = listCacheKey(folder);
+  const url = `/api/messages?folder=${encodeURIComponent(folder)}&limit=${MESSAGE_PAGE_SIZE}`;
+
+  // Show the cached page right away, then revalidate it
+  const cached = responseCache.get(key);
+  if (cached && Array.isArray(cached.data)) {
+    renderMessageList(cached.data, account, cached.total);
+  }
+
+  let result;
   try {
-    res = await fetch(`/api/messages?folder=${encodeURIComponent(folder)}`);
+    result = await fetchJsonCached(url, key);
   } catch (err) {
-    $("#messageList").innerHTML = '<li class="empty-state">Failed to fetch.</li>';
+    if (!cached) showListPlaceholder("Failed to fetch.");
+    return;
+  }
+
+  if (!Array.isArray(result.data)) {
+    showListPlaceholder("No Mail");
     return;
   }
 
-  let msgs;
+  if (result.changed || !cached) {
+    renderMessageList(result.data, account, result.total);
+  }
+}
+
+// Fetch the next page once the user scrolls near the end of what's loaded
+async function loadMoreMessages() {
+  if (state.loadingMore || !state.hasMore) return;
+  state.loadingMore = true;
+
+  const generation = state.listGeneration;
+  const folder = state.folder || "INBOX";
+  const account = state.account;
   try {
-    msgs = await res.json();
+    const res = await fetch(
+      `/api/messages?folder=${encodeURIComponent(folder)}&offset=${state.loadedCount}&limit=${MESSAGE_PAGE_SIZE}`
+    );
+    const more = await res.json();
+    if (!res.ok || !Array.isArray(more)) return;
+
+    // folder/account switched or list reloaded meanwhile
+    if (generation !== state.listGeneration) return;
+
+    state.loadedCount += more.length;
+    state.hasMore = hasMorePages(more.length);
+
+    // new mail shifts the offsets, which can repeat a row at the page boundary
+    const seen = new Set(state.messages.map(m => `${m.account}|${m.id}`));
+    more.forEach(m => {
+      if ((account === "all" || m.account === account) && !seen.has(`${m.account}|${m.id}`)) {
+        state.messages.push(m);
+      }
+    });
+
+    updateMessageCount();
+    scheduleMessageWindow();
   } catch (err) {
-    $("#messageList").innerHTML = '<li class="empty-state">No Mail</li>';
-    return;
+    console.error("Failed to load more messages", err);
+  } finally {
+    state.loadingMore = false;
   }
+}
+
+// the server reports the full match count; older responses without it fall back to page fill
+function hasMorePages(pageLength) {
+  if (state.total !== null) return state.loadedCount < state.total;
+  return pageLength >= MESSAGE_PAGE_SIZE;
+}
 
-  if (!Array.isArray(msgs)) {
-    $("#messageList").innerHTML = '<li class="empty-state">No Mail</li>';
+function renderMessageList(msgs, account, total = null) {
+  state.listGeneration++;
+  state.loadedCount = msgs.length;
+  state.total = Number.isFinite(total) ? total : null;
+  state.hasMore = hasMorePages(msgs.length);
+  state.loadingMore = false;
+  state.messages = msgs.filter(m => (account === "all" || m.account === account));
+
+  if (!state.messages.length) {
+    showListPlaceholder("No Mail");
     return;
   }
 
-  msgs = msgs.filter(m => (account === "all" || m.account === account));
+  const list = $("#messageList");
+  list.classList.remove("empty");
+  list.classList.add("virtual");
+  list.innerHTML = '<li class="virtual-spacer" aria-hidden="true"></li>';
+  rowPool.length = 0;
+
+  updateMessageCount();
+  renderMessageWindow();
+}
+
+function showListPlaceholder(text) {
+  state.messages = [];
+  state.total = null;
+  state.hasMore = false;
+  rowPool.length = 0;
+
+  const list = $("#messageList");
+  list.classList.add("empty");
+  list.classList.remove("virtual");
+  list.innerHTML = `<li class="empty-state">${escapeHtml(text)}</li>`;
+  updateMessageCount();
+}
+
+function updateMessageCount() {
+  // account filtering happens client-side, so the server total only applies to "all"
+  const n = state.account === "all" && state.total !== null ? state.total : state.messages.length;
+  const more = state.hasMore && n === state.messages.length ? "+" : "";
+  $("#messageCount").textContent = `${n}${more} ${n === 1 ? "Message" : "Messages"}`;
+}
+
+function messageRowHtml(m) {
+  const pr = m.priority || "normal";
+  const prSym = prioritySymbol(pr);
+  const prSpan = prSym ? `<span class="priority">${escapeHtml(prSym)}</span>` : "";
+  return `
+    <div class="top">
+      <span class="dot"></span>
+      ${prSpan}
+      <span class="sender">${escapeHtml(m.sender || "")}</span>
+      <span class="meta">${escapeHtml(m.date_str || "")}</span>
+    </div>
+    <div class="subject">${escapeHtml(m.subject || "")}</div>
+    <div class="preview">${escapeHtml(m.preview || "")}</div>
+  `;
+}
+
+function isSelectedMessage(m) {
+  const sel = state.selectedMessage;
+  return !!sel && sel.account === m.account && String(sel.id) === String(m.id);
+}
+
+function messageIndex(account, id) {
+  return state.messages.findIndex(m => m.account === account && String(m.id) === String(id));
+}
+
+function scheduleMessageWindow() {
+  if (listFrame === null) {
+    listFrame = requestAnimationFrame(renderMessageWindow);
+  }
+}
+
+/**
+ * Render only the rows inside the scroll viewport (plus some overscan).
+ * Row nodes come from a fixed pool: message i always lands in node
+ * i % pool size, so scrolling by one row repaints a single node.
+ */
+function renderMessageWindow() {
+  listFrame = null;
 
   const list = $("#messageList");
-  const count = $("#messageCount");
-
-  list.classList.toggle("empty", msgs.length === 0);
-  const itemsHtml = msgs.length
-    ? msgs.map(m => {
-        const pr = m.priority || "normal";
-        const prSym = prioritySymbol(pr);
-        const prSpan = prSym ? `<span class="priority">${escapeHtml(prSym)}</span>` : "";
-        return `
-          <li class="message-row ${m.unread ? "unread" : ""}"
-              data-id="${m.id}" data-account="${m.account}">
-            <div class="top">
-              <span class="dot"></span>
-              ${prSpan}
-              <span class="sender">${escapeHtml(m.sender || "")}</span>
-              <span class="meta">${escapeHtml(m.date_str || "")}</span>
-            </div>
-            <div class="subject">${escapeHtml(m.subject || "")}</div>
-            <div class="preview">${escapeHtml(m.preview || "")}</div>
-          </li>
-        `;
-      }).join("")
-    : '<li class="empty-state">No Mail</li>';
-
-  list.innerHTML = itemsHtml;
-  count.textContent = `${msgs.length} ${msgs.length === 1 ? "Message" : "Messages"}`;
+  const msgs = state.messages;
+  if (!list || !msgs.length) return;
+
+  const spacer = list.querySelector(".virtual-spacer");
+  if (spacer) spacer.style.height = `${msgs.length * ROW_HEIGHT}px`;
+
+  const first = Math.max(Math.floor(list.scrollTop / ROW_HEIGHT) - ROW_OVERSCAN, 0);
+  const last = Math.min(
+    Math.ceil((list.scrollTop + list.clientHeight) / ROW_HEIGHT) + ROW_OVERSCAN,
+    msgs.length
+  );
+
+  while (rowPool.length < last - first) {
+    const li = document.createElement("li");
+    li.className = "message-row";
+    list.appendChild(li);
+    rowPool.push(li);
+  }
+
+  const used = new Set();
+  for (let idx = first; idx < last; idx++) {
+    const m = msgs[idx];
+    const li = rowPool[idx % rowPool.length];
+    used.add(li);
+
+    if (rowMessages.get(li) !== m) {
+      rowMessages.set(li, m);
+      li.innerHTML = messageRowHtml(m);
+      li.dataset.id = m.id;
+      li.dataset.account = m.account;
+    }
+    li.hidden = false;
+    li.style.transform = `translateY(${idx * ROW_HEIGHT}px)`;
+    li.classList.toggle("unread", !!m.unread);
+    li.classList.toggle("selected", isSelectedMessage(m));
+  }
+  rowPool.forEach(li => {
+    if (!used.has(li)) li.hidden = true;
+  });
+
+  if (state.hasMore && last >= msgs.length - LOAD_MORE_THRESHOLD) {
+    loadMoreMessages();
+  }
+}
+
+function scrollMessageIntoView(idx) {
+  const list = $("#messageList");
+  if (!list) return;
+  const top = idx * ROW_HEIGHT;
+  if (top < list.scrollTop) {
+    list.scrollTop = top;
+  } else if (top + ROW_HEIGHT > list.scrollTop + list.clientHeight) {
+    list.scrollTop = top + ROW_HEIGHT - list.clientHeight;
+  }
 }
 
 function ensureMessageSelected() {
@@ -471,16 +880,11 @@ function ensureMessageSelected() {
   const list = $("#messageList");
   if (!list) return;
 
-  if (state.selectedMessage) {
-    const existing = $(
-      `.message-row[data-account="${CSS.escape(state.selectedMessage.account)}"][data-id="${CSS.escape(String(state.selectedMessage.id))}"]`
-    );
-    if (existing) return;
-  }
+  if (state.selectedMessage && state.messages.some(isSelectedMessage)) return;
 
-  const firstRow = list.querySelector(".message-row");
-  if (firstRow) {
-    openMessage(firstRow.dataset.account, firstRow.dataset.id);
+  const first = state.messages[0];
+  if (first) {
+    openMessage(first.account, first.id);
   } else {
     const pane = $("#detailPane");
     if (pane) {
@@ -495,14 +899,56 @@ async function openMessage(account, id) {
   if (!id) return;
 
   const folder = state.folder || "INBOX";
-  state.selectedMessage = { account, id };
+  const selection = { account, id };
+  const idx = messageIndex(account, id);
+  const wasUnread = idx >= 0 && !!state.messages[idx].unread;
+  state.selectedMessage = selection;
+  markRowSelected(account, id);
+
+  // Message ids are UIDs, whose content never changes: a cached copy is final
+  // and only the read flag may still need to reach the server
+  const key = messageCacheKey(folder, account, id);
+  const cached = responseCache.get(key);
+  if (cached) {
+    renderMessageDetail(account, id, folder, cached.data);
+    if (wasUnread) {
+      markReadOnServer(account, id, folder).then(scheduleCountsRefresh);
+    }
+    prefetchAdjacent(account, id);
+    return;
+  }
 
-  const res = await fetch(
-    `/api/message/${encodeURIComponent(account)}/${encodeURIComponent(id)}?mark_read=1&folder=${encodeURIComponent(folder)}`
-  );
-  if (!res.ok) return;
+  let result;
+  try {
+    result = await fetchJsonCached(messageUrl(account, id, folder, true), key);
+  } catch (err) {
+    console.error("Failed to load message", err);
+    return;
+  }
+
+  // The user may have moved on while this was in flight
+  if (state.selectedMessage !== selection) return;
+
+  renderMessageDetail(account, id, folder, result.data);
+
+  prefetchAdjacent(account, id);
+  scheduleCountsRefresh();
+}
+
+function markRowSelected(account, id) {
+  // keep the cached list page in sync so a re-render doesn't bring the dot back
+  const list = responseCache.get(listCacheKey(state.folder || "INBOX"));
+  if (list && Array.isArray(list.data)) {
+    const m = list.data.find(m => m.account === account && String(m.id) === String(id));
+    if (m) m.unread = false;
+  }
 
-  const msg = await res.json();
+  const idx = messageIndex(account, id);
+  if (idx >= 0) state.messages[idx].unread = false;
+  renderMessageWindow();
+}
+
+function renderMessageDetail(account, id, folder, msg) {
   const attachments = Array.isArray(msg.attachments) ? msg.attachments : [];
 
   // priority (always show)
@@ -521,12 +967,21 @@ async function openMessage(account, id) {
     ? `
       <div class="attachment-bar" aria-label="Attachments">
         ${attachments.map(a => {
-          const url =
-            `/api/message/${encodeURIComponent(account)}/${encodeURIComponent(id)}/attachment/${encodeURIComponent(a.index)}?folder=${encodeURIComponent(folder)}`;
+          const base =
+            `/api/message/${encodeURIComponent(account)}/${encodeURIComponent(id)}/attachment/${encodeURIComponent(a.index)}`;
+          const url = `${base}?folder=${encodeURIComponent(folder)}`;
+          // uidvalidity lets the server answer from its thumbnail cache without IMAP
+          const thumbUrl =
+            `${base}/thumb?folder=${encodeURIComponent(folder)}&uidvalidity=${encodeURIComponent(msg.uidvalidity || "")}`;
+          const isImage = msg.thumbnails !== false && String(a.content_type || "").startsWith("image/");
           return `
             <a class="attachment-pill"
                href="${url}"
                title="${escapeHtml(a.content_type || "")}">
+              ${isImage
+                ? `<img class="attachment-thumb" src="${thumbUrl}" alt="" loading="lazy"
+                        onerror="this.remove()" />`
+                : ""}
               <span class="attachment-icon" aria-hidden="true">
                 <svg viewBox="0 0 24 24">
                   <path d="M7 13.5l5.3-5.3a3 3 0 1 1 4.2 4.2L10 18a4 4 0 0 1-5.7-5.7l6.4-6.4"></path>
@@ -564,17 +1019,6 @@ async function openMessage(account, id) {
       </div>
     </article>
   `;
-
-  // mark row as read + selected
-  $$(".message-row").forEach(row => row.classList.remove("selected"));
-  const row = $(`.message-row[data-account="${CSS.escape(account)}"][data-id="${CSS.escape(String(id))}"]`);
-  if (row) {
-    row.classList.remove("unread");
-    row.classList.add("selected");
-  }
-
-  await loadInboxCounts();
-  await loadFolders();
 }
 
 // --- Delete / Restore ---
@@ -601,6 +1045,9 @@ async function deleteSelectedMessage() {
     return;
   }
 
+  invalidateFolderCache(folder);
+  invalidateFolderCache((info && info.trash_folder) || TRASH_KEY);
+
   if (info && info.restorable !== false && info.message_id) {
     state.lastDeleted = {
       account: sel.account,
@@ -613,9 +1060,11 @@ async function deleteSelectedMessage() {
     state.lastDeleted = null;
   }
 
-  const row = $(`.message-row[data-account="${CSS.escape(sel.account)}"][data-id="${CSS.escape(String(sel.id))}"]`);
-  if (row && row.parentElement) {
-    row.parentElement.removeChild(row);
+  const idx = messageIndex(sel.account, sel.id);
+  if (idx >= 0) {
+    state.messages.splice(idx, 1);
+    updateMessageCount();
+    renderMessageWindow();
   }
 
   state.selectedMessage = null;
@@ -659,6 +1108,9 @@ async function restoreLastDeleted() {
   const originalFolder = info.from_folder;
   state.lastDeleted = null;
 
+  invalidateFolderCache(info.from_folder);
+  invalidateFolderCache(info.trash_folder);
+
   await loadInboxCounts();
   await loadFolders();
   if (state.folder === originalFolder) {
@@ -667,6 +1119,19 @@ async function restoreLastDeleted() {
 }
 
 // --- UI behaviors ---
+function selectAdjacentMessage(step) {
+  const msgs = state.messages;
+  if (!msgs.length) return;
+
+  const sel = state.selectedMessage;
+  const idx = sel ? messageIndex(sel.account, sel.id) : -1;
+  const nextIdx = Math.min(Math.max(idx + step, 0), msgs.length - 1);
+  if (nextIdx === idx) return;
+
+  scrollMessageIntoView(nextIdx);
+  openMessage(msgs[nextIdx].account, msgs[nextIdx].id);
+}
+
 function setActiveAccount(account) {
   state.account = account;
 
@@ -704,6 +1169,9 @@ function setActiveFolder(folderKey) {
     a.classList.toggle("active", a.dataset.folder === state.folder);
   });
 
+  const list = $("#messageList");
+  if (list) list.scrollTop = 0;
+
   loadMessages(state.account).then(() => {
     ensureMessageSelected();
   });
@@ -772,6 +1240,17 @@ document.addEventListener("DOMContentLoaded", () => {
       return;
     }
 
+    // ARROW UP / DOWN -> previous / next message (served from the prefetch cache).
+    // Only while the list has focus, so the reading pane keeps arrow scrolling
+    // and an open draft is never replaced.
+    const inList = active && typeof active.closest === "function" && active.closest("#messageList");
+    const composing = !!document.querySelector(".compose-view");
+    if (inList && !composing && (e.key === "ArrowDown" || e.key === "ArrowUp")) {
+      e.preventDefault();
+      selectAdjacentMessage(e.key === "ArrowDown" ? 1 : -1);
+      return;
+    }
+
     // UNDO: Cmd+Z on macOS, Ctrl+Z on others
     const isZ = e.key === "z" || e.key === "Z";
     const undoCombo =
@@ -785,6 +1264,10 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   });
 
+  // only the visible rows exist; re-render the window as the list scrolls
+  $("#messageList").addEventListener("scroll", scheduleMessageWindow, { passive: true });
+  window.addEventListener("resize", scheduleMessageWindow);
+
   // click to open message
   $("#messageList").addEventListener("click", (e) => {
     const row = e.target.closest(".message-row");